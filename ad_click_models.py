@@ -1,16 +1,10 @@
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, MinMaxScaler
-from imblearn.over_sampling import SMOTE
-from sklearn.model_selection import StratifiedShuffleSplit
-from imblearn.pipeline import Pipeline as imbpipeline
-from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.metrics import f1_score
 import warnings
 import joblib
 
+# pandas, sklearn and imblearn are imported inside the training functions so
+# that importing this module (e.g. for category_to_interest) stays cheap.
+
 warnings.simplefilter('ignore')
 
 URL = r'C:\Users\rohit\OneDrive\Desktop\ClickAd\Ad_click_prediction_train (1).csv'
@@ -24,12 +18,14 @@ category_to_interest = {
     5: 'Electronics'
 }
 
-# Initialize encoders
-product_encoder = LabelEncoder()
-interest_encoder = LabelEncoder()
-ad_encoder = LabelEncoder()
+# Encoders are created and fitted in data_transformation
+product_encoder = None
+interest_encoder = None
+ad_encoder = None
 
 def clean_data(df):
+    import pandas as pd
+
     df = df.dropna(subset=['gender', 'age_level', 'user_group_id', 'user_depth'])
     df['DateTime'] = pd.to_datetime(df['DateTime'], errors='coerce')
     df['hour'] = df['DateTime'].dt.hour
@@ -37,6 +33,13 @@ def clean_data(df):
     return df
 
 def data_transformation(data):
+    global product_encoder, interest_encoder, ad_encoder
+    from sklearn.preprocessing import LabelEncoder
+
+    product_encoder = LabelEncoder()
+    interest_encoder = LabelEncoder()
+    ad_encoder = LabelEncoder()
+
     df = clean_data(data)
 
     df['city_development_index'] = df['city_development_index'].fillna(df['city_development_index'].mean()).astype(float)
@@ -61,6 +64,8 @@ def data_transformation(data):
     return df
 
 def read_data(path):
+    import pandas as pd
+
     try:
         data = pd.read_csv(path)
     except FileNotFoundError:
@@ -69,6 +74,8 @@ def read_data(path):
     return data_transformation(data)
 
 def splitting_data(data):
+    from sklearn.model_selection import StratifiedShuffleSplit
+
     X = data.drop('is_click', axis=1).values
     y = data['is_click'].values
     skf = StratifiedShuffleSplit(n_splits=5, test_size=0.25, random_state=0)
@@ -76,10 +83,20 @@ def splitting_data(data):
         return X[train_index], X[test_index], y[train_index], y[test_index]
 
 def f_score(model, X_test, y_test):
+    from sklearn.metrics import f1_score
+
     y_pred = model.predict(X_test)
     return round(f1_score(y_test, y_pred, average='weighted'), 3)
 
 def train_models(X_train, X_test, y_train, y_test):
+    import pandas as pd
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline as imbpipeline
+    from sklearn.preprocessing import MinMaxScaler
+    from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
     model_results = []
     best_model = None
     best_score = -1
@@ -0,0 +1,41 @@
+# Pre-forked deployment of the Ad Insight API:
+#
+#     gunicorn -c gunicorn.conf.py main:app
+#
+# The app (and the CTR model) is imported once in the master before forking,
+# so workers start almost instantly and share the model pages copy-on-write
+# instead of each holding a private copy.
+import gc
+import glob
+import os
+import tempfile
+
+os.environ.setdefault("AD_PRELOAD_MODEL", "1")
+
+# Aggregate /metrics across workers. Only create a temp dir when none is
+# configured, and start from an empty one so files left by dead PIDs of an
+# earlier run are not aggregated. This runs at config load rather than in
+# on_starting: with preload_app the master imports main.py (and writes its
+# startup metrics there) before on_starting is called.
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="ad_metrics_")
+for stale in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+    os.remove(stale)
+
+bind = os.environ.get("AD_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("AD_WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far (model included) out of the GC's reach;
+    # otherwise the first collection in each worker touches every object and
+    # copies the shared pages.
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
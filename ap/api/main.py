@@ -1,10 +1,69 @@
-from fastapi import FastAPI
+import time
+
+_process_start = time.perf_counter()
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from fastapi import FastAPI, File, Form, HTTPException, Request, Response, UploadFile
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+# Shared helpers live next to the Streamlit app in ap/new/utils
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "new"))
+
+from utils.metrics import REQUEST_LATENCY, MODEL_CALLS, STARTUP_SECONDS, render_metrics, track_stage
+from utils.profiler import profiler
+from utils.result_cache import get_cache
+from utils.model_store import load_artifact, load_versioned_artifact
+from utils.bulk_analysis import DEFAULT_WORKERS, analyze_bulk, archive_suffix
+
+STARTUP_SECONDS.labels(phase="imports").set(time.perf_counter() - _process_start)
+
 app = FastAPI(title="Ad Insight API")
 
+MODELS_DIR = Path(__file__).resolve().parents[1] / "new" / "models"
+MODEL_PATH = os.environ.get("AD_MODEL_PATH", str(MODELS_DIR / "adaboost_ctr_model.pkl"))
+ENCODERS_PATH = os.environ.get("AD_ENCODERS_PATH", str(MODELS_DIR / "encoders.pkl"))
+
+
+def get_model():
+    '''(model, version); reloads when the file changes'''
+    model, version = load_versioned_artifact(MODEL_PATH)
+    # Frees cached results of a replaced model from memory
+    get_cache("ctr").set_version(version)
+    return model, version
+
+
+def get_encoders():
+    return load_artifact(ENCODERS_PATH)
+
+
+# In pre-fork mode (see gunicorn.conf.py) the model is loaded here, in the
+# master, so every worker shares the same pages copy-on-write.
+if os.environ.get("AD_PRELOAD_MODEL") == "1":
+    _load_start = time.perf_counter()
+    get_model()
+    get_encoders()
+    STARTUP_SECONDS.labels(phase="model_load").set(time.perf_counter() - _load_start)
+
+STARTUP_SECONDS.labels(phase="total").set(time.perf_counter() - _process_start)
+
+PROFILER_ENABLED = os.environ.get("AD_PROFILER_ENABLED") == "1"
+# Server-side folders may only be analyzed below this root; unset disables them
+BULK_ROOT = os.environ.get("AD_BULK_ROOT")
+
+# Bump when the scoring formula below changes so cached responses are invalidated
+SCORER_VERSION = "heuristic-1"
+# Memory only: the scorer is a few arithmetic operations, cheaper than a sqlite
+# round trip, so a shared disk tier would only add latency and lock contention.
+analyze_cache = get_cache("analyze_ad", disk_dir=None)
+analyze_cache.set_version(SCORER_VERSION)
+
 season_map = {
     "Diwali_Sale": [10, 11],
     "Winter_Wear": [11, 12, 1],
@@ -32,9 +91,119 @@ class AdInput(BaseModel):
     instagram_followers: Optional[int] = 0
     facebook_followers: Optional[int] = 0
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        ).observe(time.perf_counter() - start)
+
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok", "uptime_seconds": round(time.perf_counter() - _process_start, 3)}
+
+
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+MAX_PROFILE_SECONDS = 60.0
+
+
+@app.post("/debug/profile", response_class=PlainTextResponse)
+def profile(seconds: float = 10.0):
+    # Start and stop within one request: with several workers a separate
+    # stop call would usually land on a different process.
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled (set AD_PROFILER_ENABLED=1)")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]")
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already being recorded in this worker")
+    profiler.start()
+    time.sleep(seconds)
+    return profiler.stop()
+
+
+def resolve_bulk_source(source):
+    if not BULK_ROOT:
+        raise HTTPException(status_code=403, detail="Server-side sources are disabled (set AD_BULK_ROOT)")
+    root = Path(BULK_ROOT).resolve()
+    path = (root / source).resolve()
+    if not path.is_relative_to(root):
+        raise HTTPException(status_code=403, detail="source must be inside AD_BULK_ROOT")
+    return str(path)
+
+
+@app.post("/bulk_analyze")
+def bulk_analyze(
+    archive: Optional[UploadFile] = File(None),
+    source: Optional[str] = Form(None),
+    category: str = Form("Food"),
+    time_of_day: int = Form(12),
+    interest_match: float = Form(1.0),
+    ad_company: str = Form(""),
+    max_workers: int = Form(DEFAULT_WORKERS),
+):
+    # Either upload an archive of ads, or name a folder/archive under AD_BULK_ROOT
+    if (archive is None) == (source is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'archive' or 'source'")
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        if archive is not None:
+            suffix = archive_suffix(archive.filename or "")
+            if suffix is None:
+                raise HTTPException(status_code=400, detail="Unsupported archive type")
+            path = os.path.join(upload_dir, f"upload{suffix}")
+            with open(path, "wb") as f:
+                shutil.copyfileobj(archive.file, f)
+        else:
+            path = resolve_bulk_source(source)
+
+        model, version = get_model()
+        try:
+            results = analyze_bulk(
+                path,
+                model=model,
+                version=version,
+                category_encoder=get_encoders()['ad_category'],
+                category=category,
+                time_of_day=time_of_day,
+                interest_match=interest_match,
+                ad_company=ad_company,
+                # Keep one request from monopolising the host
+                max_workers=max(1, min(max_workers, DEFAULT_WORKERS)),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Same ranked rows as the CLI report, best predicted CTR first
+    return {"count": len(results), "results": results}
+
+
 @app.post("/analyze_ad")
 def analyze_ad(input: AdInput):
     month = datetime.now().month
+    # The relevance answer depends on the current month, so it is part of the key
+    key = {"month": month, **input.model_dump()}
+    with track_stage("analyze_ad"):
+        return analyze_cache.get_or_compute(key, lambda: _analyze(input, month))
+
+
+def _analyze(input: AdInput, month):
     relevant_months = season_map.get(input.product_type, season_map["Generic"])
 
     relevant = month in relevant_months
@@ -45,6 +214,7 @@ def analyze_ad(input: AdInput):
     insta_boost = min((input.instagram_followers or 0) / 1_000_000, MAX_BOOST)
     fb_boost = min((input.facebook_followers or 0) / 1_000_000, MAX_BOOST)
 
+    MODEL_CALLS.labels(model="heuristic").inc()
     ctr = (
         0.02
         + (input.age_level / 1000)
@@ -1,19 +1,44 @@
 import streamlit as st
-import joblib
 import base64
 import tempfile
 import requests
-from utils.transcription import transcribe_audio
-from utils.keyword_extraction import extract_keywords
-from utils.trend_match import compute_trend_match
-from utils.feature_engineering import build_feature_vector
-
-model = joblib.load("models/adaboost_ctr_model.pkl")
-encoders = joblib.load("models/encoders.pkl")
+import os
+import atexit
+from utils.pipeline import AD_CATEGORIES, analyze_creative, company_relevance
+from utils.metrics import start_metrics_server, track_stage
+from utils.profiler import profiler
+from utils.model_store import load_artifact, load_versioned_artifact
+from utils.result_cache import get_cache
+
+MODEL_PATH = "models/adaboost_ctr_model.pkl"
+
+# Loaded once per process, not on every Streamlit rerun
+model, model_version = load_versioned_artifact(MODEL_PATH)
+encoders = load_artifact("models/encoders.pkl")
 category_encoder = encoders['ad_category']
 
+# Identical feature vectors are answered without touching the model. Results
+# are keyed on model_version; moving the cache to it frees entries of a
+# replaced model from memory.
+get_cache("ctr").set_version(model_version)
+
 FASTAPI_URL = "http://127.0.0.1:8000/analyze_ad"
 
+# Optional instrumentation: AD_METRICS_PORT exposes Prometheus metrics,
+# AD_PROFILE_OUTPUT samples the whole process and writes collapsed stacks on exit.
+start_metrics_server()
+PROFILE_OUTPUT = os.environ.get("AD_PROFILE_OUTPUT")
+
+
+def dump_profile():
+    with open(PROFILE_OUTPUT, "w") as f:
+        f.write(profiler.stop())
+
+
+if PROFILE_OUTPUT and not profiler.running:
+    profiler.start()
+    atexit.register(dump_profile)
+
 # Background Video
 def add_bg_video(video_file):
     video_bytes = open(video_file, "rb").read()
@@ -131,8 +156,7 @@ def predict_section():
 
     st.sidebar.header("Additional Ad Details")
     time_of_day = st.sidebar.slider("Time of Day (0-23)", 0, 23, 12)
-    categories = ["Food", "Books", "Fashion", "Sports", "Electronics"]
-    selected_category = st.sidebar.selectbox("Ad Category", options=categories)
+    selected_category = st.sidebar.selectbox("Ad Category", options=AD_CATEGORIES)
     interest_match = st.sidebar.slider("Interest Match Score (0-1)", 0.0, 1.0, 1.0)
     budget = st.sidebar.number_input("Ad Budget (₹)", 5000.0, 100000.0, 20000.0)
     ad_company = st.sidebar.text_input("Ad Company Name")
@@ -145,41 +169,26 @@ def predict_section():
             tmp.write(uploaded_file.read())
             temp_path = tmp.name
 
-        transcript = transcribe_audio(temp_path)
-        keywords = extract_keywords(transcript)
-        trend_score = compute_trend_match(keywords)
-
-        encoded_category = category_encoder.transform([selected_category])[0]
-
-        features = build_feature_vector(
-            trend_score=trend_score,
-            interest_match=interest_match,
-            category_encoded=encoded_category,
+        result = analyze_creative(
+            temp_path,
+            model=model,
+            version=model_version,
+            category_encoder=category_encoder,
+            category=selected_category,
             time_of_day=time_of_day,
-            gender_encoded=1,
-            age_level=3,
-            user_group_id=2,
-            user_depth=2,
-            city_development_index=0.5,
-            day_of_week=2,
-            product_encoded=1,
-            user_interest_encoded=1,
-            product_category_1=3,
-            product_category_2=0.0,
-            campaign_id=404347,
-            webpage_id=53587
+            interest_match=interest_match,
         )
-
-        click_prob = model.predict_proba(features)[0][1] * 100
+        transcript = result["transcript"]
+        keywords = result["keywords"]
+        trend_score = result["trend_score"]
+        click_prob = result["click_probability"] * 100
 
         st.markdown('<div class="center-card">', unsafe_allow_html=True)
         st.text_area("📝 Transcript", transcript, height=150)
         st.write("🔑 **Extracted Keywords:**", keywords)
 
         # Simple Relevance Match for Company Name
-        company_keywords = ad_company.lower().split()
-        keyword_match_count = sum(1 for kw in keywords if kw.lower() in company_keywords)
-        relevance_pct = (keyword_match_count / len(keywords)) * 100 if keywords else 0
+        relevance_pct = company_relevance(keywords, ad_company)
 
         st.metric("🔥 Trend Alignment Score (%)", f"{trend_score:.2f}")
         st.metric("🤝 Company Relevance Match (%)", f"{relevance_pct:.2f}")
@@ -197,7 +206,8 @@ def predict_section():
                 "facebook_followers": facebook_followers
             }
             try:
-                res = requests.post(FASTAPI_URL, json=payload)
+                with track_stage("analyze_api"):
+                    res = requests.post(FASTAPI_URL, json=payload)
                 if res.ok:
                     insights = res.json()
                     st.info(f"✅ Relevance: {insights['relevance']}")
@@ -249,7 +259,8 @@ def analyze_section():
 
         with st.spinner("Contacting AI API..."):
             try:
-                res = requests.post(FASTAPI_URL, json=payload)
+                with track_stage("analyze_api"):
+                    res = requests.post(FASTAPI_URL, json=payload)
                 
                 st.write("Raw API Response:", res.status_code, res.text)
 
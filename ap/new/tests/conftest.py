@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app modules import their helpers as `utils.*`, relative to ap/new
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
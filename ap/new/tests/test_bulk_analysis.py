@@ -0,0 +1,111 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from utils import bulk_analysis
+from utils.bulk_analysis import analyze_bulk, collect_ads
+
+
+class FakeEncoder:
+    classes_ = ["Books", "Food"]
+
+    def transform(self, values):
+        return [self.classes_.index(v) for v in values]
+
+
+def test_zip_member_outside_extract_dir_is_rejected(tmp_path):
+    archive = tmp_path / "ads.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("../../escaped.mp3", "x")
+    extract_dir = tmp_path / "a" / "b"
+    extract_dir.mkdir(parents=True)
+
+    with pytest.raises(ValueError):
+        collect_ads(str(archive), str(extract_dir))
+    assert not list(tmp_path.rglob("escaped.mp3"))
+
+
+def test_tar_parent_member_is_rejected(tmp_path):
+    archive = tmp_path / "ads.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        info = tarfile.TarInfo("../../escaped.mp3")
+        info.size = 1
+        tf.addfile(info, io.BytesIO(b"x"))
+    extract_dir = tmp_path / "a" / "b"
+    extract_dir.mkdir(parents=True)
+
+    with pytest.raises(ValueError):
+        collect_ads(str(archive), str(extract_dir))
+    assert not list(tmp_path.rglob("escaped.mp3"))
+
+
+@pytest.mark.parametrize("name", ["ads.zip", "ads.tar.gz"])
+def test_corrupt_archive_raises_value_error(tmp_path, name):
+    archive = tmp_path / name
+    archive.write_bytes(b"not an archive")
+
+    with pytest.raises(ValueError):
+        collect_ads(str(archive), str(tmp_path / "out"))
+
+
+def test_archive_ads_are_collected(tmp_path):
+    archive = tmp_path / "ads.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("one.mp4", "x")
+        zf.writestr("nested/two.wav", "x")
+        zf.writestr("notes.txt", "x")
+    extract_dir = tmp_path / "out"
+    extract_dir.mkdir()
+
+    ads = collect_ads(str(archive), str(extract_dir))
+    assert [os.path.relpath(p, extract_dir) for p in ads] == [os.path.join("nested", "two.wav"), "one.mp4"]
+
+
+def test_symlink_outside_folder_is_skipped(tmp_path):
+    outside = tmp_path / "secret.mp3"
+    outside.write_text("x")
+    folder = tmp_path / "ads"
+    folder.mkdir()
+    (folder / "ok.mp3").write_text("x")
+    os.symlink(outside, folder / "link.mp3")
+
+    assert collect_ads(str(folder), str(tmp_path / "unused")) == [str(folder / "ok.mp3")]
+
+
+def test_bad_options_fail_before_any_file_is_analyzed(tmp_path, monkeypatch):
+    (tmp_path / "ad.mp3").write_text("x")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("analyze_creative should not run")
+
+    monkeypatch.setattr(bulk_analysis, "analyze_creative", fail)
+    options = dict(model=None, version="v", category_encoder=FakeEncoder())
+
+    with pytest.raises(ValueError):
+        analyze_bulk(str(tmp_path), category="Gaming", **options)
+    with pytest.raises(ValueError):
+        analyze_bulk(str(tmp_path), category="Food", time_of_day=24, **options)
+
+
+def test_results_are_ranked_and_failures_reported(tmp_path, monkeypatch):
+    for name in ("low.mp3", "high.mp3", "broken.mp3"):
+        (tmp_path / name).write_text("x")
+
+    def fake_analyze(path, **kwargs):
+        if "broken" in path:
+            raise RuntimeError("decode failed")
+        prob = 0.9 if "high" in path else 0.1
+        return {"transcript": "", "keywords": ["acme"], "trend_score": 0.0, "click_probability": prob}
+
+    monkeypatch.setattr(bulk_analysis, "analyze_creative", fake_analyze)
+    results = analyze_bulk(
+        str(tmp_path), model=None, version="v", category_encoder=FakeEncoder(),
+        category="Food", ad_company="Acme", max_workers=2,
+    )
+
+    assert [(r["rank"], r["file"]) for r in results] == [(1, "high.mp3"), (2, "low.mp3"), (3, "broken.mp3")]
+    assert results[0]["company_relevance"] == 100.0
+    assert results[2]["error"] == "decode failed"
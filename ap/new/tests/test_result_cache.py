@@ -0,0 +1,61 @@
+from utils import result_cache
+from utils.result_cache import ResultCache, canonical_key
+
+
+def test_none_result_is_cached():
+    cache = ResultCache("test_none", disk_dir=None)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_compute([[1, 2]], compute) is None
+    assert cache.get_or_compute([[1, 2]], compute) is None
+    assert len(calls) == 1
+
+
+def test_equivalent_features_share_a_key():
+    assert canonical_key([[1, 2.0]], "v") == canonical_key([[1.0, 2]], "v")
+    assert canonical_key([[1, 2]], "v1") != canonical_key([[1, 2]], "v2")
+
+
+def test_set_version_drops_memory_tier():
+    cache = ResultCache("test_version", disk_dir=None)
+    cache.set_version("v1")
+    key = canonical_key([[1]], "v1")
+    cache.set(key, 0.5)
+    assert cache.get(key) == 0.5
+
+    cache.set_version("v2")
+    assert cache.get(key) is None
+
+
+def test_explicit_version_overrides_cache_version():
+    cache = ResultCache("test_explicit", disk_dir=None)
+    cache.set_version("v1")
+    cache.get_or_compute([[1]], lambda: 0.1, version="a")
+    assert cache.get_or_compute([[1]], lambda: 0.9, version="b") == 0.9
+    assert cache.get_or_compute([[1]], lambda: 0.9, version="a") == 0.1
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    first = ResultCache("test_shared", disk_dir=str(tmp_path))
+    first.get_or_compute([[1]], lambda: 0.25, version="v")
+
+    second = ResultCache("test_shared", disk_dir=str(tmp_path))
+    assert second.get_or_compute([[1]], lambda: 0.75, version="v") == 0.25
+
+
+def test_disk_pruning_respects_disk_maxsize(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "PRUNE_EVERY", 10)
+    cache = ResultCache("test_prune", maxsize=2, disk_dir=str(tmp_path))
+    for i in range(100):
+        cache.set(str(i), i)
+
+    rows = cache._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    # Pruned on the 100th write, so exactly disk_maxsize rows remain
+    assert rows == cache.disk_maxsize == 16
+    assert cache.get("99") == 99
+    cache._entries.clear()
+    assert cache.get("0") is None
@@ -0,0 +1,174 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.pipeline import AD_CATEGORIES, analyze_creative, company_relevance
+from utils.transcription import set_max_models
+from utils.metrics import track_stage
+
+AD_EXTENSIONS = (".mp4", ".mp3", ".wav")
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+DEFAULT_WORKERS = int(os.environ.get("AD_BULK_WORKERS", "4"))
+
+REPORT_FIELDS = [
+    "rank", "file", "click_probability", "trend_score", "company_relevance", "keywords", "error",
+]
+
+
+def archive_suffix(name):
+    '''The supported archive extension `name` ends with, or None'''
+    lowered = name.lower()
+    return next((ext for ext in ARCHIVE_EXTENSIONS if lowered.endswith(ext)), None)
+
+
+def unpack_archive(archive, extract_dir):
+    '''Extract an archive, refusing members that would land outside extract_dir.
+
+    Unsafe, corrupt or mislabelled archives raise ValueError.
+    '''
+    try:
+        if archive.lower().endswith(".zip"):
+            root = os.path.realpath(extract_dir)
+            with zipfile.ZipFile(archive) as zf:
+                for name in zf.namelist():
+                    target = os.path.realpath(os.path.join(root, name))
+                    if os.path.commonpath([root, target]) != root:
+                        raise ValueError(f"Archive member escapes the extraction directory: {name}")
+                zf.extractall(root)
+        else:
+            # The "data" filter rejects absolute paths, "..", links pointing
+            # outside the target and device files
+            shutil.unpack_archive(archive, extract_dir, filter="data")
+    except (zipfile.BadZipFile, shutil.ReadError, tarfile.TarError) as e:
+        raise ValueError(f"Unsafe or invalid archive: {e}")
+
+
+def collect_ads(source, extract_dir):
+    '''List the ad files in a directory or archive (extracted into extract_dir)'''
+    if os.path.isfile(source) and archive_suffix(source):
+        unpack_archive(source, extract_dir)
+        source = extract_dir
+    if not os.path.isdir(source):
+        raise ValueError(f"Not a directory or supported archive: {source}")
+
+    root_dir = os.path.realpath(source)
+    ads = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            path = os.path.join(root, name)
+            # Skip symlinks that point outside the folder being analyzed
+            inside = os.path.commonpath([root_dir, os.path.realpath(path)]) == root_dir
+            if inside and name.lower().endswith(AD_EXTENSIONS):
+                ads.append(path)
+    return sorted(ads)
+
+
+def analyze_bulk(source, *, model, version, category_encoder, category, time_of_day=12, interest_match=1.0,
+                 ad_company="", max_workers=DEFAULT_WORKERS):
+    '''Analyze every ad in `source` with a bounded worker pool, ranked by click probability.
+
+    Workers share the CTR model and KeyBERT; each gets its own Whisper model so
+    transcriptions run in parallel. Trend lookups stay throttled (see
+    utils.trend_match). A file that fails is reported with its error instead
+    of aborting the batch.
+    '''
+    # Fail fast on bad options instead of once per file after transcription
+    if category not in category_encoder.classes_:
+        raise ValueError(f"Unknown category {category!r}; expected one of {list(category_encoder.classes_)}")
+    if not 0 <= time_of_day <= 23:
+        raise ValueError(f"time_of_day must be between 0 and 23, got {time_of_day}")
+
+    max_workers = max(1, max_workers)
+    set_max_models(max_workers)
+    with tempfile.TemporaryDirectory() as extract_dir:
+        ads = collect_ads(source, extract_dir)
+        base_dir = source if os.path.isdir(source) else extract_dir
+
+        def run(path):
+            row = {"file": os.path.relpath(path, base_dir)}
+            try:
+                with track_stage("bulk_item"):
+                    result = analyze_creative(
+                        path,
+                        model=model,
+                        version=version,
+                        category_encoder=category_encoder,
+                        category=category,
+                        time_of_day=time_of_day,
+                        interest_match=interest_match,
+                    )
+            except Exception as e:
+                row.update(click_probability=None, trend_score=None, company_relevance=None,
+                           keywords=[], transcript="", error=str(e))
+            else:
+                row.update(result, company_relevance=company_relevance(result["keywords"], ad_company), error="")
+            return row
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(run, ads))
+
+    results.sort(key=lambda r: (r["click_probability"] is None, -(r["click_probability"] or 0)))
+    for rank, row in enumerate(results, start=1):
+        row["rank"] = rank
+    return results
+
+
+def write_report(results, path):
+    '''Write the ranked results as .json (full detail) or .csv (one row per ad)'''
+    if path.lower().endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        return
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in results:
+            writer.writerow({**row, "keywords": ", ".join(row["keywords"])})
+
+
+if __name__ == '__main__':
+    from utils.model_store import load_artifact, load_versioned_artifact
+
+    parser = argparse.ArgumentParser(description="Analyze a folder or archive of ad creatives and rank them by CTR")
+    parser.add_argument("source", help="Directory or archive (.zip/.tar.gz) of mp4/mp3/wav ads")
+    parser.add_argument("--report", default="bulk_report.csv", help="Output path (.csv or .json)")
+    parser.add_argument("--category", default="Food", choices=AD_CATEGORIES)
+    parser.add_argument("--time-of-day", type=int, default=12, choices=range(24), metavar="0-23")
+    parser.add_argument("--interest-match", type=float, default=1.0)
+    parser.add_argument("--ad-company", default="")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--model", default="models/adaboost_ctr_model.pkl")
+    parser.add_argument("--encoders", default="models/encoders.pkl")
+    args = parser.parse_args()
+
+    model, version = load_versioned_artifact(args.model)
+    encoders = load_artifact(args.encoders)
+
+    try:
+        results = analyze_bulk(
+            args.source,
+            model=model,
+            version=version,
+            category_encoder=encoders['ad_category'],
+            category=args.category,
+            time_of_day=args.time_of_day,
+            interest_match=args.interest_match,
+            ad_company=args.ad_company,
+            max_workers=args.workers,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    write_report(results, args.report)
+
+    for row in results[:10]:
+        prob = "failed" if row["click_probability"] is None else f"{row['click_probability'] * 100:.2f}%"
+        print(f"{row['rank']:>3}. {row['file']}: {prob}")
+    print(f"✅ Wrote report for {len(results)} ads to {args.report}")
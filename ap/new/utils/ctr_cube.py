@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Column order of the 16-feature vector (see utils.feature_engineering)
+FEATURES = [
+    "product",
+    "campaign_id",
+    "webpage_id",
+    "product_category_1",
+    "product_category_2",
+    "gender",
+    "age_level",
+    "user_group_id",
+    "user_depth",
+    "city_development_index",
+    "hour",
+    "day_of_week",
+    "user_interest",
+    "ad_category",
+    "interest_match",
+    "trend_score",
+]
+
+# Discrete segments enumerated by the cube, with the domains used by the forms.
+# campaign_id and webpage_id are not bucketed: the model splits on the raw ids,
+# so a bucket representative would give a different score than the model.
+# The cube holds the exact ids passed to build_cube(); others fall back.
+SEGMENTS = {
+    "product_category_1": [1, 2, 3, 4, 5],
+    "gender": [0, 1],
+    "age_level": [1, 2, 3, 4, 5],
+    "user_group_id": [1, 2, 3, 4, 5],
+    "user_depth": [1, 2, 3],
+    "hour": list(range(24)),
+    "day_of_week": list(range(7)),
+}
+
+# Everything that is not a dimension of the cube is pinned to these values;
+# they match the defaults of the Ad Click Prediction form.
+DEFAULT_FIXED = {
+    "product_category_2": 0.0,
+    "city_development_index": 0.5,
+    "user_interest": 0,
+    "ad_category": 0,
+    "interest_match": 1,
+    "trend_score": 0,
+}
+
+
+def build_cube(model, products, campaign_ids, webpage_ids, fixed=None, batch_size=100_000):
+    '''Score the full cross-product of segments with the model.
+
+    Returns (cube, meta): a float32 array with one axis per dimension, and the
+    metadata needed to index it back from a feature vector.
+    '''
+    fixed = {**DEFAULT_FIXED, **(fixed or {})}
+    dims = [
+        ("product", list(products)),
+        ("campaign_id", list(campaign_ids)),
+        ("webpage_id", list(webpage_ids)),
+    ] + [(name, values) for name, values in SEGMENTS.items()]
+
+    shape = tuple(len(values) for _, values in dims)
+    total = int(np.prod(shape))
+    cube = np.empty(total, dtype=np.float32)
+
+    template = np.array([fixed.get(name, 0) for name in FEATURES], dtype=float)
+    columns = [FEATURES.index(name) for name, _ in dims]
+    domains = [np.asarray(values, dtype=float) for _, values in dims]
+
+    for start in range(0, total, batch_size):
+        stop = min(start + batch_size, total)
+        index = np.unravel_index(np.arange(start, stop), shape)
+        batch = np.tile(template, (stop - start, 1))
+        for column, domain, positions in zip(columns, domains, index):
+            batch[:, column] = domain[positions]
+        cube[start:stop] = model.predict_proba(batch)[:, 1]
+
+    meta = {
+        "dims": [{"name": name, "values": values} for name, values in dims],
+        "fixed": fixed,
+    }
+    return cube.reshape(shape), meta
+
+
+def save_cube(path, cube, meta):
+    '''Write `<path>.npy` (memory-mappable) and its `<path>.json` metadata'''
+    np.save(f"{path}.npy", cube)
+    with open(f"{path}.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+class CubeScorer:
+    """
+    Answers CTR lookups straight from a precomputed cube.
+
+    lookup() returns None for any feature vector the cube does not cover
+    (unknown product/campaign/webpage, out-of-range segment, non-default fixed
+    feature, or a cube built for another model version); the caller then
+    scores it with the live model.
+    """
+
+    def __init__(self, path, version=None):
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        self.cube = np.load(f"{path}.npy", mmap_mode="r")
+        self.enabled = version is None or meta.get("model_version") == version
+        if not self.enabled:
+            logger.warning(
+                "CTR cube %s was built for model %s but %s is loaded; every lookup will use the live model",
+                path, meta.get("model_version"), version,
+            )
+        self._axes = [
+            (FEATURES.index(dim["name"]), {float(v): i for i, v in enumerate(dim["values"])})
+            for dim in meta["dims"]
+        ]
+        self._fixed = [(FEATURES.index(name), float(value)) for name, value in meta["fixed"].items()]
+
+    def lookup(self, features):
+        row = features[0]
+        if self.enabled and all(float(row[column]) == value for column, value in self._fixed):
+            try:
+                index = tuple(positions[float(row[column])] for column, positions in self._axes)
+            except KeyError:
+                pass
+            else:
+                record_cache("ctr_cube", True)
+                return float(self.cube[index])
+        record_cache("ctr_cube", False)
+        return None
+
+
+def load_cube(path, version=None):
+    '''CubeScorer for `path`, or None if the cube has not been built'''
+    if not path or not os.path.exists(f"{path}.npy"):
+        return None
+    return CubeScorer(path, version=version)
+
+
+if __name__ == '__main__':
+    import joblib
+    from utils.result_cache import model_version
+
+    parser = argparse.ArgumentParser(description="Precompute the CTR lookup cube for the low-cardinality segments")
+    parser.add_argument("--model", default="models/adaboost_ctr_model.pkl")
+    parser.add_argument("--encoders", default="models/encoders.pkl")
+    parser.add_argument("--out", default="models/ctr_cube")
+    parser.add_argument("--campaign-ids", type=int, nargs="+", default=[404347])
+    parser.add_argument("--webpage-ids", type=int, nargs="+", default=[53587])
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    encoders = joblib.load(args.encoders)
+    products = range(len(encoders['product'].classes_))
+
+    cube, meta = build_cube(model, products, args.campaign_ids, args.webpage_ids)
+    meta["model_version"] = model_version(args.model)
+    save_cube(args.out, cube, meta)
+
+    print(f"✅ Saved CTR cube {cube.shape} ({cube.size} cells, {cube.nbytes / 1e6:.1f} MB) to {args.out}.npy")
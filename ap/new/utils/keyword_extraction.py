@@ -1,7 +1,17 @@
-from keybert import KeyBERT
+import threading
 
-kw_model = KeyBERT()
+_kw_model = None
+_lock = threading.Lock()
+
+def get_kw_model():
+    # KeyBERT pulls in sentence-transformers/torch, so load it on first use
+    global _kw_model
+    with _lock:
+        if _kw_model is None:
+            from keybert import KeyBERT
+            _kw_model = KeyBERT()
+    return _kw_model
 
 def extract_keywords(text, num_keywords=5):
-    keywords = kw_model.extract_keywords(text, stop_words='english', top_n=num_keywords)
+    keywords = get_kw_model().extract_keywords(text, stop_words='english', top_n=num_keywords)
     return [kw for kw, _ in keywords]
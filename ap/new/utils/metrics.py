@@ -0,0 +1,108 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+# Whisper and pytrends routinely take several seconds, so the buckets go well
+# past the prometheus_client defaults (which stop at 10s).
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "ad_request_latency_seconds",
+    "HTTP request latency of the Ad Insight API",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "ad_stage_latency_seconds",
+    "Latency of a single pipeline stage (transcription, keywords, trends, model, ...)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "ad_stage_failures_total",
+    "Pipeline stages that raised or fell back to a default value",
+    ["stage"],
+)
+MODEL_CALLS = Counter(
+    "ad_model_calls_total",
+    "Calls into a CTR scoring model",
+    ["model"],
+)
+CACHE_HITS = Counter(
+    "ad_cache_hits_total",
+    "Lookups answered from a cache",
+    ["cache"],
+)
+CACHE_MISSES = Counter(
+    "ad_cache_misses_total",
+    "Lookups that missed a cache",
+    ["cache"],
+)
+STARTUP_SECONDS = Gauge(
+    "ad_startup_seconds",
+    "Time spent getting a process ready, per phase (imports, model_load, total)",
+    ["phase"],
+    multiprocess_mode="max",
+)
+
+_server_started = False
+
+
+@contextmanager
+def track_stage(stage):
+    '''Time the wrapped block under `stage` and count it as a failure if it raises'''
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(stage=stage).inc()
+        raise
+    finally:
+        STAGE_LATENCY.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def record_cache(cache, hit):
+    '''Count a single cache lookup'''
+    (CACHE_HITS if hit else CACHE_MISSES).labels(cache=cache).inc()
+
+
+def render_metrics():
+    '''Return (body, content_type) for a /metrics response.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (several uvicorn/gunicorn workers),
+    the samples of every worker are aggregated instead of only this process.
+    '''
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port=None):
+    '''Expose /metrics on its own port for processes without a web API (Streamlit).
+
+    Does nothing unless a port is given or AD_METRICS_PORT is set; safe to call on
+    every Streamlit rerun.
+    '''
+    global _server_started
+    port = port or os.environ.get("AD_METRICS_PORT")
+    if _server_started or not port:
+        return
+    start_http_server(int(port))
+    _server_started = True
@@ -0,0 +1,36 @@
+import os
+import threading
+
+import joblib
+
+from utils.metrics import track_stage
+from utils.result_cache import model_version
+
+_artifacts = {}
+_lock = threading.Lock()
+
+
+def load_versioned_artifact(path):
+    '''Like load_artifact(), but also return the model_version() of what was loaded'''
+    path = os.path.abspath(path)
+    version = model_version(path)
+    with _lock:
+        cached = _artifacts.get(path)
+        if cached is None or cached[0] != version:
+            with track_stage("model_load"):
+                # Replace rather than add, so a reload frees the old model
+                _artifacts[path] = (version, joblib.load(path))
+        version, artifact = _artifacts[path]
+    return artifact, version
+
+
+def load_artifact(path):
+    '''Load a joblib artifact (model, encoders) once per process and reuse it.
+
+    Streamlit reruns and repeated API calls get the already-loaded object until
+    the file's content changes, so the model in use always matches the
+    model_version() the result caches are keyed on. In a pre-forked server
+    (gunicorn --preload) call it at import time so workers inherit the model
+    copy-on-write instead of each loading their own copy.
+    '''
+    return load_versioned_artifact(path)[0]
@@ -0,0 +1,62 @@
+from utils.transcription import transcribe_audio
+from utils.keyword_extraction import extract_keywords
+from utils.trend_match import compute_trend_match
+from utils.feature_engineering import build_feature_vector
+from utils.metrics import MODEL_CALLS, track_stage
+from utils.result_cache import get_cache
+
+# Ad categories offered by the Analyzer (the classes of the ad_category encoder)
+AD_CATEGORIES = ["Food", "Books", "Fashion", "Sports", "Electronics"]
+
+
+def company_relevance(keywords, ad_company):
+    '''Share of extracted keywords that appear in the company name, in %'''
+    company_keywords = (ad_company or "").lower().split()
+    keyword_match_count = sum(1 for kw in keywords if kw.lower() in company_keywords)
+    return (keyword_match_count / len(keywords)) * 100 if keywords else 0
+
+
+def analyze_creative(path, *, model, version, category_encoder, category, time_of_day=12, interest_match=1.0):
+    '''Run transcription, keyword extraction, trend scoring and CTR prediction for one ad file.
+
+    `version` is the model_version() of `model`; cached CTR results are keyed on it.
+    '''
+    with track_stage("transcription"):
+        transcript = transcribe_audio(path)
+    with track_stage("keyword_extraction"):
+        keywords = extract_keywords(transcript)
+    with track_stage("trend_match"):
+        trend_score = compute_trend_match(keywords)
+
+    encoded_category = category_encoder.transform([category])[0]
+
+    features = build_feature_vector(
+        trend_score=trend_score,
+        interest_match=interest_match,
+        category_encoded=encoded_category,
+        time_of_day=time_of_day,
+        gender_encoded=1,
+        age_level=3,
+        user_group_id=2,
+        user_depth=2,
+        city_development_index=0.5,
+        day_of_week=2,
+        product_encoded=1,
+        user_interest_encoded=1,
+        product_category_1=3,
+        product_category_2=0.0,
+        campaign_id=404347,
+        webpage_id=53587
+    )
+
+    def score():
+        MODEL_CALLS.labels(model="adaboost").inc()
+        with track_stage("model_predict"):
+            return float(model.predict_proba(features)[0][1])
+
+    return {
+        "transcript": transcript,
+        "keywords": keywords,
+        "trend_score": float(trend_score),
+        "click_probability": get_cache("ctr").get_or_compute(features, score, version=version),
+    }
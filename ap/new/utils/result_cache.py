@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metrics import record_cache
+
+DEFAULT_MAXSIZE = int(os.environ.get("AD_CACHE_SIZE", "4096"))
+DEFAULT_TTL = float(os.environ.get("AD_CACHE_TTL", "3600"))
+# Setting AD_CACHE_DIR enables the on-disk tier shared by all workers on a host
+CACHE_DIR = os.environ.get("AD_CACHE_DIR")
+# The disk tier may hold this many times more rows than the in-memory tier
+DISK_SIZE_FACTOR = 8
+# Expired/excess disk rows are pruned once every this many writes
+PRUNE_EVERY = 256
+
+_MISSING = object()
+
+_caches = {}
+_caches_lock = threading.Lock()
+_versions = {}
+_versions_lock = threading.Lock()
+_inherited_connections = []
+
+
+def model_version(path):
+    '''Content hash of a model file, so copies and fresh checkouts share a version.
+
+    The hash is only recomputed when the file's size or mtime changes, which
+    keeps calling this on every request or Streamlit rerun cheap.
+    '''
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    with _versions_lock:
+        cached = _versions.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    version = f"sha256:{digest.hexdigest()[:16]}"
+    with _versions_lock:
+        _versions[path] = (stamp, version)
+    return version
+
+
+def canonical_key(features, version):
+    '''Hash a feature vector (or JSON-able payload) together with the model version.
+
+    Numbers are normalised so that 2, 2.0 and np.int64(2) map to the same key.
+    '''
+    def normalise(value):
+        if hasattr(value, "tolist"):
+            value = value.tolist()
+        if isinstance(value, dict):
+            return {str(k): normalise(v) for k, v in sorted(value.items())}
+        if isinstance(value, (list, tuple)):
+            return [normalise(v) for v in value]
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        return round(float(value), 6)
+
+    raw = json.dumps([version, normalise(features)], separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache with per-entry TTL and an optional sqlite tier on disk.
+
+    Entries are keyed on (model version, canonical features); calling
+    set_version() with a new version drops the in-memory tier, and stale disk
+    entries simply stop matching until they are pruned. Any JSON-able value,
+    None included, can be cached.
+    """
+
+    def __init__(self, name, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, disk_dir=CACHE_DIR):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.disk_maxsize = maxsize * DISK_SIZE_FACTOR
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db_path = None
+        self._db = None
+        self._db_pid = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._db_path = os.path.join(disk_dir, f"{name}.sqlite")
+
+    def _connection(self):
+        # sqlite connections must not cross fork(); a cache created in a
+        # pre-forked master opens a fresh connection in every worker.
+        if self._db_path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            if self._db is not None:
+                # Keep the parent's handle alive: closing it here could
+                # checkpoint or unlock the database underneath the parent.
+                _inherited_connections.append(self._db)
+            self._db = sqlite3.connect(self._db_path, timeout=5, check_same_thread=False)
+            self._db_pid = os.getpid()
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def set_version(self, version):
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            self._entries.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM results WHERE expires < ?", (time.time(),))
+                db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM results")
+                db.commit()
+
+    def get(self, key, default=None):
+        '''Cached value for `key`, or `default` if it is missing or expired'''
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                record_cache(self.name, True)
+                return entry[0]
+            self._entries.pop(key, None)
+
+            db = self._connection()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value, expires FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    value = json.loads(row[0])
+                    self._store(key, value, row[1])
+                    record_cache(self.name, True)
+                    return value
+
+        record_cache(self.name, False)
+        return default
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires)
+            db = self._connection()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires),
+                )
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune_disk(db)
+                db.commit()
+
+    def get_or_compute(self, features, compute, version=None):
+        '''Return the cached result for `features`, calling compute() on a miss.
+
+        `version` overrides the cache's current version for this lookup; pass
+        the version of the model compute() actually uses.
+        '''
+        key = canonical_key(features, self.version if version is None else version)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def _prune_disk(self, db):
+        # Drop expired rows, then the oldest ones beyond disk_maxsize. The TTL
+        # is fixed, so the earliest expiry is also the oldest write.
+        db.execute("DELETE FROM results WHERE expires < ?", (time.time(),))
+        db.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.disk_maxsize,),
+        )
+
+    def _store(self, key, value, expires):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def get_cache(name, **kwargs):
+    '''Process-wide cache per name, so Streamlit reruns keep hitting the same instance'''
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = ResultCache(name, **kwargs)
+        return _caches[name]
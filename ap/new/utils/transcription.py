@@ -1,15 +1,58 @@
 import os
-import whisper
+import queue
+import threading
 
 # Ensure ffmpeg path is explicitly added (adjust if your ffmpeg is elsewhere)
 os.environ["PATH"] += os.pathsep + r"C:\ffmpeg\bin"
 
-model = whisper.load_model("base")
+# Whisper installs kv-cache hooks on the model while decoding, so one model
+# cannot serve two transcriptions at once. Models are kept in a pool instead:
+# each concurrent caller borrows its own, up to _max_models (~150 MB each for
+# "base"); further callers wait for one to be returned.
+_pool = queue.LifoQueue()
+_created = 0
+_max_models = int(os.environ.get("AD_WHISPER_MODELS", "1"))
+_lock = threading.Lock()
+
+def set_max_models(count):
+    """
+    Allows up to `count` Whisper models, e.g. one per bulk worker.
+    """
+    global _max_models
+    with _lock:
+        _max_models = max(_max_models, count)
+
+def _acquire_model():
+    global _created
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        pass
+
+    with _lock:
+        create = _created < _max_models
+        if create:
+            _created += 1
+    if not create:
+        return _pool.get()
+
+    try:
+        # Loaded on first use, so importing this module stays cheap
+        import whisper
+        return whisper.load_model("base")
+    except Exception:
+        with _lock:
+            _created -= 1
+        raise
 
 def transcribe_audio(file_path):
     """
     Transcribes audio or video file to text using Whisper.
     Supports paths to saved files (use .getbuffer() in Streamlit before calling this).
     """
-    result = model.transcribe(file_path)
+    model = _acquire_model()
+    try:
+        result = model.transcribe(file_path)
+    finally:
+        _pool.put(model)
     return result["text"]
@@ -1,14 +1,29 @@
-from pytrends.request import TrendReq
+import os
+import threading
+from utils.metrics import STAGE_FAILURES
 
-pytrends = TrendReq()
+_local = threading.local()
+# Google Trends answers bursts of parallel requests with HTTP 429, which
+# would silently turn into a 0 score, so concurrent lookups are capped.
+_slots = threading.BoundedSemaphore(int(os.environ.get("AD_TRENDS_CONCURRENCY", "1")))
+
+def get_pytrends():
+    # TrendReq imports pandas and opens an HTTP session, so create it on first use.
+    # It keeps the last payload on the instance, hence one per thread.
+    if not hasattr(_local, "pytrends"):
+        from pytrends.request import TrendReq
+        _local.pytrends = TrendReq()
+    return _local.pytrends
 
 def compute_trend_match(keywords, category=None):
     try:
+        pytrends = get_pytrends()
         # Combine category with keywords for more precise trend search
         search_terms = [f"{category} {kw}" if category else kw for kw in keywords]
         
-        pytrends.build_payload(search_terms, timeframe='now 7-d')  # Last 7 days trends
-        trend_data = pytrends.interest_over_time()
+        with _slots:
+            pytrends.build_payload(search_terms, timeframe='now 7-d')  # Last 7 days trends
+            trend_data = pytrends.interest_over_time()
         
         if trend_data.empty:
             return 0
@@ -16,4 +31,6 @@ def compute_trend_match(keywords, category=None):
         score = trend_data.mean().mean()
         return min(score, 100)
     except:
+        # Falls back to a neutral score, but keep the failure visible in metrics
+        STAGE_FAILURES.labels(stage="trend_match").inc()
         return 0
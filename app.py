@@ -1,10 +1,22 @@
+import os
+import sys
+from pathlib import Path
 import streamlit as st
 import numpy as np
-import joblib
 
-# Load trained model and encoders
-model = joblib.load(r"C:\Users\rohit\OneDrive\Desktop\ClickAd\adaboost_ctr_model.pkl")
-encoders = joblib.load(r"C:\Users\rohit\OneDrive\Desktop\ClickAd\encoders.pkl")
+# Shared helpers live next to the Ad Analyzer app in ap/new/utils
+sys.path.insert(0, str(Path(__file__).resolve().parent / "ap" / "new"))
+
+from utils.metrics import MODEL_CALLS, track_stage
+from utils.result_cache import get_cache
+from utils.ctr_cube import load_cube
+from utils.model_store import load_artifact, load_versioned_artifact
+
+MODEL_PATH = r"C:\Users\rohit\OneDrive\Desktop\ClickAd\adaboost_ctr_model.pkl"
+
+# Load trained model and encoders (once per process, not on every rerun)
+model, MODEL_VERSION = load_versioned_artifact(MODEL_PATH)
+encoders = load_artifact(r"C:\Users\rohit\OneDrive\Desktop\ClickAd\encoders.pkl")
 
 product_encoder = encoders['product']
 interest_encoder = encoders['user_interest']
@@ -14,6 +26,32 @@ valid_products = list(product_encoder.classes_)
 valid_interests = list(interest_encoder.classes_)
 valid_ads = list(ad_encoder.classes_)
 
+# Repeated (product, campaign, webpage, segment, hour, day) inputs skip the model
+ctr_cache = get_cache("ctr_form")
+ctr_cache.set_version(MODEL_VERSION)
+
+# Precomputed segment cube (python -m utils.ctr_cube, from ap/new); only used
+# when it was built for the model loaded above.
+ctr_cube = load_cube(os.environ.get("AD_CTR_CUBE"), version=MODEL_VERSION)
+
+
+def run_model(input_data):
+    MODEL_CALLS.labels(model="adaboost").inc()
+    with track_stage("model_predict"):
+        proba = model.predict_proba(input_data)[0][1] if hasattr(model, "predict_proba") else None
+        prediction = model.predict(input_data)[0]
+    return {
+        "proba": None if proba is None else float(proba),
+        "prediction": int(prediction),
+    }
+
+
+def score(input_data):
+    proba = ctr_cube.lookup(input_data) if ctr_cube else None
+    if proba is not None:
+        return {"proba": proba, "prediction": int(proba >= 0.5)}
+    return ctr_cache.get_or_compute(input_data, lambda: run_model(input_data))
+
 st.set_page_config(page_title="Ad Click Prediction", page_icon="🖱️")
 
 st.title("🖱️ Advertisement Click Prediction with CTR Estimate")
@@ -98,16 +136,17 @@ if st.button("🔮 Predict Click"):
 
     st.subheader("🎯 Prediction Result:")
 
+    result = score(input_data)
+
     # CTR Probability
-    if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(input_data)[0][1] * 100
+    if result["proba"] is not None:
+        proba = result["proba"] * 100
         st.progress(int(proba))
         st.write(f"**Estimated CTR (Click Probability): {proba:.2f}%**")
     else:
         st.info("CTR percentage not available for this model.")
 
-    prediction = model.predict(input_data)[0]
-    if prediction == 1:
+    if result["prediction"] == 1:
         st.success("✅ Likely the user will CLICK the Ad!")
     else:
         st.warning("❌ Unlikely the user will click the Ad.")
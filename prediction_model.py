@@ -1,24 +1,29 @@
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
 from joblib import load
 import warnings
 
+# pandas and sklearn are only needed to prepare raw CSV data, so they are
+# imported inside those functions; scoring prepared features needs neither.
+
 warnings.simplefilter('ignore')
 
 MODELSPATH = r"C:\Users\rohit\OneDrive\Desktop\ClickAd\adaboost_ctr_model.pkl"
 URL = r"C:\Users\rohit\OneDrive\Desktop\ClickAd\Ad_Click_prediciton_test.csv"
-LABEL_ENCODER = LabelEncoder()
+
+_MODELS = {}
 
 
 def load_model(model_path):
-    '''Load pretrained model'''
-    model = load(model_path)
-    return model
+    '''Load pretrained model once per process'''
+    if model_path not in _MODELS:
+        _MODELS[model_path] = load(model_path)
+    return _MODELS[model_path]
     
 
 def clean_data(df):
     '''Delete missing data, perform feature engineering for date time feature'''
+    import pandas as pd
+
     df = df.dropna(subset=['gender', 'age_level', 'user_group_id', 'user_depth'])
     df['DateTime'] = pd.to_datetime(df['DateTime'], errors='coerce')
     df['hour'] = df['DateTime'].dt.hour
@@ -36,12 +41,15 @@ category_to_interest = {
 
 def data_transformation(data):
     '''Fill missing values, convert non-numeric values, and apply feature engineering'''
+    from sklearn.preprocessing import LabelEncoder
+
+    label_encoder = LabelEncoder()
     df = clean_data(data)
     df['city_development_index'] = df['city_development_index'].fillna('0')
     df['product_category_2'] = df['product_category_2'].fillna('0')
     df['gender'] = df['gender'].map({'Male': 0, 'Female': 1})
     
-    df['product'] = LABEL_ENCODER.fit_transform(df['product'])
+    df['product'] = label_encoder.fit_transform(df['product'])
 
     # Add interest mapping same as training
     df['user_interest'] = df['product_category_1'].map(category_to_interest)
@@ -52,8 +60,8 @@ def data_transformation(data):
 
     df['ad_category'] = np.where(aligned, df['user_interest'], random_ads)
 
-    df['user_interest'] = LABEL_ENCODER.fit_transform(df['user_interest'])
-    df['ad_category'] = LABEL_ENCODER.fit_transform(df['ad_category'])
+    df['user_interest'] = label_encoder.fit_transform(df['user_interest'])
+    df['ad_category'] = label_encoder.fit_transform(df['ad_category'])
 
     df['interest_match'] = (df['user_interest'] == df['ad_category']).astype(int)
 
@@ -64,6 +72,8 @@ def data_transformation(data):
 
 def read_data(path):
     '''Read data and perform data transformation'''
+    import pandas as pd
+
     data = pd.read_csv(path)
     df = data_transformation(data)
     return df